@@ -3,12 +3,13 @@ import hashlib
 import random
 
 class NavidromeAPI:
-    def __init__(self, base_url, username, password):
+    def __init__(self, base_url, username, password, timeout=None):
         if not base_url.startswith("http://") and not base_url.startswith("https://"):
             base_url = "http://" + base_url
         self.base_url = base_url.rstrip("/") + "/rest"
         self.username = username
         self.password = password
+        self.timeout = timeout
         self.client_name = "ComfortClient"
         self.api_version = "1.16.1"
         self.salt = str(random.randint(1000, 9999))
@@ -31,24 +32,62 @@ class NavidromeAPI:
             params.update(extra)
         return params
 
+    def build_url(self, endpoint, extra=None):
+        """
+        Return a fully signed URL for endpoint, e.g. for handing to VLC.
+        """
+        request = requests.Request("GET", f"{self.base_url}/{endpoint}", params=self._build_params(extra))
+        return request.prepare().url
+
     def ping(self):
         url = f"{self.base_url}/ping.view"
-        response = requests.get(url, params=self._build_params())
+        response = requests.get(url, params=self._build_params(), timeout=self.timeout)
         return response.json()
 
     def get_artists(self):
         url = f"{self.base_url}/getArtists.view"
-        response = requests.get(url, params=self._build_params())
+        response = requests.get(url, params=self._build_params(), timeout=self.timeout)
         return response.json()
 
     def get_artist(self, artist_id):
         url = f"{self.base_url}/getArtist.view"
         params = self._build_params({"id": artist_id})
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=self.timeout)
         return response.json()
 
     def get_album(self, album_id):
         url = f"{self.base_url}/getAlbum.view"
         params = self._build_params({"id": album_id})
-        response = requests.get(url, params=params)
-        return response.json()
\ No newline at end of file
+        response = requests.get(url, params=params, timeout=self.timeout)
+        return response.json()
+
+    def get_cover_art(self, cover_id, size=None):
+        url = f"{self.base_url}/getCoverArt.view"
+        extra = {"id": cover_id}
+        if size:
+            extra["size"] = size
+        response = requests.get(url, params=self._build_params(extra), timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    def download(self, song_id):
+        """
+        Return a streaming response for the original file of song_id.
+        """
+        url = f"{self.base_url}/download.view"
+        params = self._build_params({"id": song_id})
+        response = requests.get(url, params=params, stream=True, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def search3(self, query="", song_count=500, song_offset=0):
+        url = f"{self.base_url}/search3.view"
+        params = self._build_params({
+            "query": query,
+            "songCount": song_count,
+            "songOffset": song_offset,
+            "artistCount": 0,
+            "albumCount": 0,
+        })
+        response = requests.get(url, params=params, timeout=self.timeout)
+        return response.json()
@@ -0,0 +1,220 @@
+# assets.py
+#
+# Assets used by the client are packed into one indexed bundle
+# (assets/assets.pak) that is memory-mapped at startup. Run
+# `python assets.py` to rebuild it by hand; it is also rebuilt
+# automatically when a packed file changes.
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+from memory import BoundedCache, pixmap_cost
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+BUNDLE_PATH = os.path.join(ASSET_DIR, "assets.pak")
+BUNDLE_MAGIC = b"NDAB"
+BUNDLE_VERSION = 1
+
+# Every asset the client loads; only these are packed
+USED_ASSETS = (
+    "background.jpg",
+    "default_cover.png",
+    "icon.png",
+    "icons/arrow-alt-circle-up.svg",
+    "icons/circle-play.svg",
+    "icons/circle-left.svg",
+    "icons/circle-right.svg",
+)
+
+_HEADER = struct.Struct("<4sII")  # magic, version, index length
+
+
+def asset_path(name):
+    """
+    Absolute path of an asset, independent of the working directory.
+    """
+    return os.path.join(ASSET_DIR, name)
+
+
+def _source_stamps(names):
+    stamps = {}
+    for name in names:
+        try:
+            stat = os.stat(asset_path(name))
+        except OSError:
+            continue
+        stamps[name] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def pack(names=USED_ASSETS, path=BUNDLE_PATH):
+    """
+    Write the bundle: header, JSON index of name -> [offset, size, mtime_ns], then the data.
+    """
+    stamps = _source_stamps(names)
+    blobs = []
+    index = {}
+    offset = 0
+    for name, (mtime_ns, _) in stamps.items():
+        with open(asset_path(name), "rb") as f:
+            data = f.read()
+        index[name] = [offset, len(data), mtime_ns]
+        blobs.append(data)
+        offset += len(data)
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp_path, path)
+    return index
+
+
+class AssetBundle:
+    """
+    Read-only view of a packed bundle. Lookups slice the memory map, so
+    each asset is read from the page cache at most once.
+    """
+    def __init__(self, path=BUNDLE_PATH):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = _HEADER.unpack_from(self._map, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {BUNDLE_VERSION} asset bundle")
+        start = _HEADER.size
+        self.index = json.loads(self._map[start:start + index_length])
+        self._data_start = start + index_length
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def read(self, name):
+        offset, size, _ = self.index[name]
+        start = self._data_start + offset
+        return self._map[start:start + size]
+
+    def is_stale(self, names=USED_ASSETS):
+        stamps = _source_stamps(names)
+        if stamps.keys() != self.index.keys():
+            return True
+        return any(self.index[name][1:] != [size, mtime_ns] for name, (mtime_ns, size) in stamps.items())
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def open_bundle():
+    """
+    Open the bundle, rebuilding it first if it is missing or out of date.
+    Returns None if no usable bundle can be had (e.g. read-only install).
+    """
+    try:
+        bundle = AssetBundle()
+        if not bundle.is_stale():
+            return bundle
+        bundle.close()
+    except (OSError, ValueError):
+        pass
+    try:
+        pack()
+        return AssetBundle()
+    except (OSError, ValueError) as e:
+        print(f"Asset bundle unavailable, using loose files: {e}")
+        return None
+
+
+class AssetCache:
+    """
+    Shared cache of decoded pixmaps and icons.
+
+    SVG icons are rasterized once per (name, size, device pixel ratio);
+    raster images are decoded once. Needs a QApplication to exist.
+    """
+    def __init__(self, bundle=None):
+        self.bundle = bundle
+        self.pixmaps = BoundedCache("Assets", cost=pixmap_cost)
+        self.icons = {}
+
+    def read(self, name):
+        if self.bundle is not None and name in self.bundle:
+            return self.bundle.read(name)
+        try:
+            with open(asset_path(name), "rb") as f:
+                return f.read()
+        except OSError:
+            print(f"Missing asset: {name}")
+            return b""
+
+    def pixmap(self, name):
+        from PyQt6.QtGui import QPixmap
+
+        if name not in self.pixmaps:
+            pixmap = QPixmap()
+            data = self.read(name)
+            if data:
+                pixmap.loadFromData(data)
+            self.pixmaps[name] = pixmap
+            return pixmap
+        return self.pixmaps[name]
+
+    def svg_pixmap(self, name, size, dpr):
+        from PyQt6.QtCore import QByteArray, Qt
+        from PyQt6.QtGui import QPainter, QPixmap
+        from PyQt6.QtSvg import QSvgRenderer
+
+        key = (name, size, dpr)
+        if key not in self.pixmaps:
+            pixels = int(round(size * dpr))
+            pixmap = QPixmap(pixels, pixels)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            renderer = QSvgRenderer(QByteArray(self.read(name)))
+            if renderer.isValid():
+                painter = QPainter(pixmap)
+                renderer.render(painter)
+                painter.end()
+            pixmap.setDevicePixelRatio(dpr)
+            self.pixmaps[key] = pixmap
+            return pixmap
+        return self.pixmaps[key]
+
+    def icon(self, name, size=16, dpr=None):
+        """
+        QIcon for assets/icons/<name>.svg at size logical pixels.
+        """
+        from PyQt6.QtGui import QGuiApplication, QIcon
+
+        if dpr is None:
+            screen = QGuiApplication.primaryScreen()
+            dpr = screen.devicePixelRatio() if screen else 1.0
+        key = (name, size, dpr)
+        if key not in self.icons:
+            self.icons[key] = QIcon(self.svg_pixmap(f"icons/{name}.svg", size, dpr))
+        return self.icons[key]
+
+
+_cache = None
+
+
+def assets():
+    """
+    Return the process-wide AssetCache, opening the bundle on first use.
+    """
+    global _cache
+    if _cache is None:
+        _cache = AssetCache(open_bundle())
+    return _cache
+
+
+if __name__ == "__main__":
+    packed = pack()
+    total = sum(size for _, size, _ in packed.values())
+    print(f"Packed {len(packed)} assets ({total / 1024:.0f} KiB) into {BUNDLE_PATH}")
+    sys.exit(0)
@@ -0,0 +1,57 @@
+# cache.py
+
+import os
+
+CACHE_DIR = "cache"
+PARTIAL_SUFFIX = ".part"
+PEAK_SUFFIX = ".peaks"
+
+
+def cache_dir(config):
+    return config.get("cache_dir", CACHE_DIR)
+
+
+def cover_path(config, cover_id):
+    """
+    Path of the cached cover art image for cover_id.
+    """
+    return os.path.join(cache_dir(config), "covers", f"{cover_id}.img")
+
+
+def audio_path(config, song):
+    """
+    Path of the cached original audio file for a song dict.
+    """
+    suffix = song.get("suffix") or "bin"
+    return os.path.join(cache_dir(config), "audio", f"{song['id']}.{suffix}")
+
+
+def peak_path(audio_file):
+    """
+    Waveform peak file stored next to a cached audio file.
+    """
+    return audio_file + PEAK_SUFFIX
+
+
+def write_atomic(path, chunks):
+    """
+    Write an iterable of byte chunks to path via a temporary file, so a
+    crash never leaves a half-written file that looks complete.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + PARTIAL_SUFFIX
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+                    size += len(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return size
@@ -0,0 +1,312 @@
+# cli.py
+#
+# Headless entry point for bulk library operations, e.g. nightly cache warming:
+#
+#   python cli.py cache --covers --audio --workers 8
+#   python cli.py export --format csv --output library.csv
+#   python cli.py bench --rounds 10
+#   python cli.py audit
+
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cache import PARTIAL_SUFFIX, PEAK_SUFFIX, audio_path, cache_dir, cover_path, write_atomic
+from config import load_config
+from connection import ConnectionManager, servers_from_config
+
+DEFAULT_WORKERS = 8
+
+EXPORT_FIELDS = [
+    "id", "title", "artist", "album", "albumId", "genre", "year", "track",
+    "duration", "bitRate", "size", "suffix", "path", "playCount", "userRating", "coverArt",
+]
+
+IMAGE_MAGIC = (b"\xff\xd8\xff", b"\x89PNG", b"GIF8", b"RIFF")
+
+
+class Progress:
+    """
+    Thread-safe progress counter printed on a single stderr line.
+    """
+    def __init__(self, label, total, quiet=False):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.quiet = quiet
+        self._lock = threading.Lock()
+        self._last_print = 0.0
+
+    def advance(self, ok=True):
+        with self._lock:
+            self.done += 1
+            if not ok:
+                self.failed += 1
+            now = time.monotonic()
+            if now - self._last_print >= 0.1 or self.done == self.total:
+                self._last_print = now
+                self._print()
+
+    def _print(self):
+        if self.quiet:
+            return
+        failed = f", {self.failed} failed" if self.failed else ""
+        end = "\n" if self.done >= self.total else ""
+        sys.stderr.write(f"\r{self.label}: {self.done}/{self.total}{failed}{end}")
+        sys.stderr.flush()
+
+
+def run_parallel(func, items, workers, progress):
+    """
+    Run func over items on a worker pool, advancing progress as each finishes.
+    Returns the results of successful calls; failures are reported, skipped
+    and counted in progress.failed.
+    """
+    results = []
+    if not items:
+        return results
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+                progress.advance()
+            except Exception as e:
+                progress.advance(ok=False)
+                print(f"\n{progress.label} failed for {futures[future]!r}: {e}", file=sys.stderr)
+    return results
+
+
+def connect(config):
+    servers = servers_from_config(config)
+    username = config.get("username")
+    password = config.get("password")
+    if not servers or not username or not password:
+        raise SystemExit("No saved login in config.json. Connect once from the GUI first.")
+    api = ConnectionManager(servers, username, password)
+    if not api.select():
+        raise SystemExit("Could not reach any Navidrome server.")
+    return api
+
+
+def fetch_library(api, workers, quiet=False):
+    """
+    Walk artists -> albums -> songs and return a flat list of song dicts,
+    plus the number of artists and albums that could not be fetched.
+    """
+    data = api.get_artists()
+    indexes = data.get("subsonic-response", {}).get("artists", {}).get("index", [])
+    artist_ids = [artist["id"] for group in indexes for artist in group.get("artist", [])]
+
+    def albums_of(artist_id):
+        artist = api.get_artist(artist_id).get("subsonic-response", {}).get("artist", {})
+        return [album["id"] for album in artist.get("album", [])]
+
+    artists = Progress("Artists", len(artist_ids), quiet)
+    album_ids = [a for albums in run_parallel(albums_of, artist_ids, workers, artists) for a in albums]
+
+    def songs_of(album_id):
+        album = api.get_album(album_id).get("subsonic-response", {}).get("album", {})
+        return album.get("song", [])
+
+    albums = Progress("Albums", len(album_ids), quiet)
+    songs = [song for songs in run_parallel(songs_of, album_ids, workers, albums) for song in songs]
+    return songs, artists.failed + albums.failed
+
+
+def report_incomplete(failed):
+    """
+    Warn about a partial library walk and return the command's exit status.
+    """
+    if failed:
+        print(f"Library walk incomplete: {failed} artist(s)/album(s) failed.", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_export(api, config, args):
+    songs, failed = fetch_library(api, args.workers, args.quiet)
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            json.dump(songs, out, indent=2, ensure_ascii=False)
+            out.write("\n")
+        else:
+            writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(songs)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Exported {len(songs)} tracks.", file=sys.stderr)
+    return report_incomplete(failed)
+
+
+def cmd_cache(api, config, args):
+    if not args.covers and not args.audio:
+        args.covers = args.audio = True
+    songs, failed = fetch_library(api, args.workers, args.quiet)
+    status = report_incomplete(failed)
+
+    if args.covers:
+        cover_ids = sorted({s["coverArt"] for s in songs if s.get("coverArt")})
+        missing = [c for c in cover_ids if args.force or not os.path.exists(cover_path(config, c))]
+
+        def fetch_cover(cover_id):
+            return write_atomic(cover_path(config, cover_id), [api.get_cover_art(cover_id)])
+
+        progress = Progress("Covers", len(missing), args.quiet)
+        sizes = run_parallel(fetch_cover, missing, args.workers, progress)
+        if progress.failed:
+            status = 1
+        print(f"Covers: {len(sizes)} fetched ({sum(sizes) / 1e6:.1f} MB), {len(cover_ids) - len(missing)} already cached.", file=sys.stderr)
+
+    if args.audio:
+        missing = [s for s in songs if args.force or not os.path.exists(audio_path(config, s))]
+
+        def fetch_audio(song):
+            response = api.download(song["id"])
+            with response:
+                return write_atomic(audio_path(config, song), response.iter_content(chunk_size=256 * 1024))
+
+        progress = Progress("Audio", len(missing), args.quiet)
+        sizes = run_parallel(fetch_audio, missing, args.workers, progress)
+        if progress.failed:
+            status = 1
+        print(f"Audio: {len(sizes)} fetched ({sum(sizes) / 1e6:.1f} MB), {len(songs) - len(missing)} already cached.", file=sys.stderr)
+    return status
+
+
+def cmd_bench(api, config, args):
+    samples = {endpoint.base_url: [] for endpoint in api.endpoints}
+    for _ in range(args.rounds):
+        for url, latency in api.probe().items():
+            if latency is not None:
+                samples[url].append(latency * 1000)
+
+    print(f"{'endpoint':<45} {'ok':>5} {'min':>8} {'median':>8} {'max':>8}")
+    for url, values in samples.items():
+        if values:
+            print(f"{url:<45} {len(values):>5} {min(values):>7.1f}ms {statistics.median(values):>7.1f}ms {max(values):>7.1f}ms")
+        else:
+            print(f"{url:<45} {0:>5} {'-':>8} {'-':>8} {'-':>8}")
+
+    # Throughput of the selected endpoint under parallel metadata load
+    api.select()
+    start = time.perf_counter()
+    songs, failed = fetch_library(api, args.workers, args.quiet)
+    elapsed = time.perf_counter() - start
+    print(f"Library walk via {api.base_url}: {len(songs)} tracks in {elapsed:.2f}s with {args.workers} workers")
+    return report_incomplete(failed)
+
+
+def cmd_audit(api, config, args):
+    songs, failed = fetch_library(api, args.workers, args.quiet)
+    problems = []
+
+    for song in songs:
+        missing = [field for field in ("id", "title", "albumId") if not song.get(field)]
+        if missing:
+            problems.append(f"track {song.get('id')}: missing {', '.join(missing)}")
+
+    def check_audio(song):
+        path = audio_path(config, song)
+        if not os.path.exists(path):
+            return None
+        actual = os.path.getsize(path)
+        expected = song.get("size")
+        if expected and actual != expected:
+            return f"audio {path}: {actual} bytes, server reports {expected}"
+        return None
+
+    def check_cover(cover_id):
+        path = cover_path(config, cover_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            head = f.read(8)
+        if not head.startswith(IMAGE_MAGIC):
+            return f"cover {path}: not a recognised image"
+        return None
+
+    cover_ids = sorted({s["coverArt"] for s in songs if s.get("coverArt")})
+    unchecked = 0
+    for label, check, items in (("Audio files", check_audio, songs), ("Cover files", check_cover, cover_ids)):
+        progress = Progress(label, len(items), args.quiet)
+        problems += run_parallel(check, items, args.workers, progress)
+        unchecked += progress.failed
+
+    # Cached files that no longer belong to any track in the library. After a
+    # partial walk, files of the albums that failed would all look orphaned.
+    known = {os.path.basename(audio_path(config, s)) for s in songs}
+    known |= {os.path.basename(cover_path(config, c)) for c in cover_ids}
+    partial = 0
+    for sub in ("audio", "covers") if not failed else ():
+        directory = os.path.join(cache_dir(config), sub)
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.endswith(PARTIAL_SUFFIX):
+                    # Left behind by an interrupted download; harmless, overwritten next time
+                    partial += 1
+                    continue
+                # Peak files belong to the audio file they sit next to
+                owner = name[:-len(PEAK_SUFFIX)] if name.endswith(PEAK_SUFFIX) else name
+                if owner not in known or (owner != name and not os.path.exists(os.path.join(directory, owner))):
+                    problems.append(f"orphan {os.path.join(directory, name)}")
+    if partial:
+        print(f"{partial} leftover partial download(s) ({PARTIAL_SUFFIX}) in the cache.", file=sys.stderr)
+
+    problems = [p for p in problems if p]
+    for problem in problems:
+        print(problem)
+    print(f"Audit finished: {len(songs)} tracks, {len(problems)} problem(s).", file=sys.stderr)
+    return 1 if report_incomplete(failed) or unchecked or problems else 0
+
+
+def build_parser(config):
+    # Options shared by every command, accepted after the command name
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, default=config.get("cli_workers", DEFAULT_WORKERS),
+                        help="size of the worker pool (default: %(default)s)")
+    common.add_argument("--quiet", action="store_true", help="do not print progress")
+
+    parser = argparse.ArgumentParser(description="NeoDrone headless library tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", parents=[common], help="export the library as JSON or CSV")
+    export.add_argument("--format", choices=["json", "csv"], default="json")
+    export.add_argument("--output", help="output file (default: stdout)")
+    export.set_defaults(func=cmd_export)
+
+    cache = sub.add_parser("cache", parents=[common], help="pre-cache cover art and/or audio")
+    cache.add_argument("--covers", action="store_true", help="cache cover art")
+    cache.add_argument("--audio", action="store_true", help="cache original audio files")
+    cache.add_argument("--force", action="store_true", help="re-download files that are already cached")
+    cache.set_defaults(func=cmd_cache)
+
+    bench = sub.add_parser("bench", parents=[common], help="benchmark configured server endpoints")
+    bench.add_argument("--rounds", type=int, default=5)
+    bench.set_defaults(func=cmd_bench)
+
+    audit = sub.add_parser("audit", parents=[common], help="check library metadata and cached files")
+    audit.set_defaults(func=cmd_audit)
+    return parser
+
+
+def main(argv=None):
+    config = load_config()
+    args = build_parser(config).parse_args(argv)
+    args.workers = max(1, args.workers)
+    api = connect(config)
+    return args.func(api, config, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# connection.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from api import NavidromeAPI
+
+PROBE_TIMEOUT = 2.0
+REQUEST_TIMEOUT = 10.0
+
+
+def servers_from_config(config):
+    """
+    Return the list of server URLs stored in config.
+    Older configs only have a single "server" entry.
+    """
+    servers = config.get("servers") or []
+    if not servers and config.get("server"):
+        servers = [config["server"]]
+    return [s for s in servers if s]
+
+
+class ConnectionManager:
+    """
+    Holds several endpoints for the same Navidrome library and routes calls
+    to the fastest healthy one, failing over when a request errors out.
+
+    Attribute access is forwarded to the active NavidromeAPI, so the manager
+    can be used anywhere a NavidromeAPI is expected.
+    """
+    def __init__(self, servers, username, password, probe_timeout=PROBE_TIMEOUT, timeout=REQUEST_TIMEOUT):
+        # Connect and read limits are separate: an unreachable endpoint (e.g. the
+        # LAN address while on mobile) fails as fast as a probe and triggers
+        # failover, while slow responses from a reachable one still get time
+        self.endpoints = [
+            NavidromeAPI(server, username, password, timeout=(probe_timeout, timeout)) for server in servers
+        ]
+        self.probe_timeout = probe_timeout
+        self.latencies = {}
+        self.active = None
+        self._failover_lock = threading.Lock()
+
+    def __bool__(self):
+        return self.active is not None
+
+    def __getattr__(self, name):
+        # Only reached for names the manager itself does not define
+        active = self.__dict__.get("active")
+        if active is None:
+            raise AttributeError(f"No active Navidrome endpoint (looking up {name!r})")
+        attr = getattr(active, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def call_with_failover(*args, **kwargs):
+            try:
+                return attr(*args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # HTTP status errors (e.g. a missing cover) say nothing about the endpoint
+                print(f"Request to {active.base_url} failed: {e}")
+                if not self.failover(active):
+                    raise
+                return getattr(self.active, name)(*args, **kwargs)
+
+        return call_with_failover
+
+    def _probe_one(self, endpoint):
+        """
+        Ping one endpoint and return its latency in seconds, or None if it is unhealthy.
+        """
+        start = time.perf_counter()
+        try:
+            response = requests.get(
+                f"{endpoint.base_url}/ping.view",
+                params=endpoint._build_params(),
+                timeout=self.probe_timeout,
+            )
+            status = response.json().get("subsonic-response", {}).get("status")
+        except (requests.RequestException, ValueError):
+            return None
+        if status != "ok":
+            return None
+        return time.perf_counter() - start
+
+    def probe(self, endpoints=None):
+        """
+        Ping endpoints in parallel and record their latencies.
+        A dead endpoint costs at most probe_timeout, regardless of how many there are.
+        """
+        endpoints = self.endpoints if endpoints is None else endpoints
+        if not endpoints:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+            results = list(pool.map(self._probe_one, endpoints))
+        for endpoint, latency in zip(endpoints, results):
+            self.latencies[endpoint.base_url] = latency
+        return {endpoint.base_url: latency for endpoint, latency in zip(endpoints, results)}
+
+    def _fastest(self, endpoints):
+        healthy = [e for e in endpoints if self.latencies.get(e.base_url) is not None]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda e: self.latencies[e.base_url])
+
+    def select(self):
+        """
+        Probe every endpoint and activate the lowest-latency healthy one.
+        Returns it, or None if nothing answered (the active endpoint is then unchanged).
+        """
+        self.probe()
+        fastest = self._fastest(self.endpoints)
+        if fastest is None:
+            # Keep whatever was active so a later failover can still recover
+            return None
+        self.active = fastest
+        latency_ms = self.latencies[fastest.base_url] * 1000
+        print(f"Using {fastest.base_url} ({latency_ms:.0f} ms)")
+        return fastest
+
+    def failover(self, failed=None):
+        """
+        Switch away from the failed endpoint (default: the active one) to the
+        fastest healthy endpoint. The failed endpoint is re-probed as a last
+        resort. If nothing answers, the active endpoint is kept as it is.
+        Returns True if a healthy endpoint is active afterwards.
+        """
+        with self._failover_lock:
+            if failed is None:
+                failed = self.active
+            elif self.active is not failed:
+                # Another thread already failed over while we waited
+                return True
+            candidates = [e for e in self.endpoints if e is not failed]
+            self.probe(candidates)
+            replacement = self._fastest(candidates)
+            if replacement is None and failed is not None:
+                self.probe([failed])
+                replacement = self._fastest([failed])
+            if replacement is None:
+                print("No healthy Navidrome endpoint; keeping the current one.")
+                return False
+            if replacement is not failed:
+                print(f"Failed over to {replacement.base_url}")
+            self.active = replacement
+            return True
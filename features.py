@@ -0,0 +1,102 @@
+# features.py
+
+import numpy as np
+
+# Numeric columns of the feature matrix, in order
+FEATURES = ("year", "duration", "bitRate", "playCount", "replayGain", "userRating")
+
+
+def iter_songs(api, page_size=500):
+    """
+    Yield every song in the library, paging through search3 with an empty query.
+    """
+    offset = 0
+    while True:
+        data = api.search3("", song_count=page_size, song_offset=offset)
+        songs = data.get("subsonic-response", {}).get("searchResult3", {}).get("song", [])
+        yield from songs
+        if len(songs) < page_size:
+            return
+        offset += page_size
+
+
+def _replay_gain(song):
+    gain = song.get("replayGain")
+    if isinstance(gain, dict):
+        return gain.get("trackGain", gain.get("albumGain"))
+    return gain
+
+
+def _column(songs, name):
+    if name == "replayGain":
+        values = (_replay_gain(s) for s in songs)
+    else:
+        values = (s.get(name) for s in songs)
+    return np.fromiter((np.nan if v is None else v for v in values), dtype=np.float64, count=len(songs))
+
+
+def _percentile_ranks(column):
+    """
+    Map a column onto [0, 1] by rank, so skewed fields like playCount and
+    bitRate spread evenly. Tied values share their average rank, so a column
+    with no variance (and any missing value) lands on the median, 0.5.
+    """
+    ranks = np.full(column.shape, 0.5, dtype=np.float32)
+    present = ~np.isnan(column)
+    count = int(present.sum())
+    if count > 1:
+        unique, inverse, counts = np.unique(column[present], return_inverse=True, return_counts=True)
+        if len(unique) > 1:
+            first = np.cumsum(counts) - counts
+            average = first + (counts - 1) / 2
+            ranks[present] = average[inverse] / (count - 1)
+    return ranks
+
+
+class TrackFeatures:
+    """
+    Column store of library metadata as NumPy arrays.
+
+    The per-song work happens once, when the store is built; everything that
+    reads it afterwards (e.g. MoodEngine) works on whole arrays at a time.
+    """
+    def __init__(self, songs):
+        self.songs = list(songs)
+        count = len(self.songs)
+        self.ids = np.array([s.get("id") for s in self.songs], dtype=object)
+        self.index = {track_id: i for i, track_id in enumerate(self.ids)}
+
+        self.matrix = np.empty((count, len(FEATURES)), dtype=np.float32)
+        for j, name in enumerate(FEATURES):
+            self.matrix[:, j] = _percentile_ranks(_column(self.songs, name))
+
+        # Genres are stored as codes into a lower-cased vocabulary
+        genre_names = [(s.get("genre") or "").strip().lower() for s in self.songs]
+        self.genres, codes = np.unique(np.array(genre_names, dtype=object), return_inverse=True)
+        self.genre_codes = codes.astype(np.int32)
+
+        self._memory_cost = self.matrix.nbytes + self.genre_codes.nbytes + self.ids.nbytes + sum(
+            s.memory_cost() if hasattr(s, "memory_cost") else 0 for s in self.songs
+        )
+
+    def __len__(self):
+        return len(self.songs)
+
+    def column(self, name):
+        """
+        Normalized [0, 1] values of a feature for every track.
+        """
+        return self.matrix[:, FEATURES.index(name)]
+
+    def indices_of(self, track_ids):
+        """
+        Row indices of the given track ids; unknown ids are ignored.
+        """
+        return np.array([self.index[t] for t in track_ids if t in self.index], dtype=np.intp)
+
+    def memory_cost(self):
+        # The store never changes after construction, so this is measured once
+        return self._memory_cost
+
+    def tracks(self, indices):
+        return [self.songs[i] for i in indices]
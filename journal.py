@@ -0,0 +1,162 @@
+# journal.py
+
+import queue
+import sqlite3
+import threading
+import time
+
+JOURNAL_PATH = "journal.db"
+EVENT_KINDS = ("play", "skip", "mood", "note")
+FIELDS = ("ts", "kind", "track_id", "title", "artist", "mood", "note", "position_ms")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    track_id TEXT,
+    title TEXT,
+    artist TEXT,
+    mood TEXT,
+    note TEXT,
+    position_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_kind_ts ON events (kind, ts);
+CREATE INDEX IF NOT EXISTS events_track_ts ON events (track_id, ts);
+"""
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class Journal:
+    """
+    Append-only listening journal backed by SQLite in WAL mode.
+
+    log() only puts the event on a queue; a background thread writes
+    events in batches, so callers on the playback path never touch disk.
+    Queries use their own connection, which WAL lets read alongside the writer.
+    """
+    def __init__(self, path=JOURNAL_PATH, batch_size=256):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._read_conn = _connect(path)
+        self._read_conn.executescript(SCHEMA)
+        self._read_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name="journal-writer", daemon=True)
+        self._writer.start()
+
+    def log(self, kind, song=None, mood=None, note=None, position_ms=None, ts=None):
+        """
+        Queue an event. song is a Subsonic song dict (or None).
+        """
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"Unknown journal event kind: {kind}")
+        song = song or {}
+        self._queue.put((
+            time.time() if ts is None else ts,
+            kind,
+            song.get("id"),
+            song.get("title"),
+            song.get("artist"),
+            mood,
+            note,
+            position_ms,
+        ))
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        insert = f"INSERT INTO events ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})"
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            events = []
+            waiters = []
+            for item in batch:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    events.append(item)
+            if events:
+                try:
+                    with conn:
+                        conn.executemany(insert, events)
+                except sqlite3.Error as e:
+                    print(f"Journal write failed: {e}")
+            for waiter in waiters:
+                waiter.set()
+        conn.close()
+
+    def flush(self, timeout=5.0):
+        """
+        Block until every event queued so far has been written.
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=5.0)
+        self._read_conn.close()
+
+    def _query(self, sql, params=()):
+        with self._read_lock:
+            return [dict(row) for row in self._read_conn.execute(sql, params)]
+
+    def events_between(self, start, end, kinds=None):
+        """
+        Events with start <= ts < end (unix seconds), oldest first.
+        """
+        if kinds:
+            marks = ", ".join("?" * len(kinds))
+            return self._query(
+                f"SELECT * FROM events WHERE kind IN ({marks}) AND ts >= ? AND ts < ? ORDER BY ts",
+                (*kinds, start, end),
+            )
+        return self._query("SELECT * FROM events WHERE ts >= ? AND ts < ? ORDER BY ts", (start, end))
+
+    def plays_between(self, start, end):
+        return self.events_between(start, end, kinds=("play",))
+
+    def most_skipped(self, start, end=None, limit=10):
+        """
+        Tracks with the most skips in [start, end), most skipped first.
+        """
+        end = time.time() if end is None else end
+        return self._query(
+            """
+            SELECT track_id, MAX(title) AS title, MAX(artist) AS artist, COUNT(*) AS skips
+            FROM events
+            WHERE kind = 'skip' AND ts >= ? AND ts < ?
+            GROUP BY track_id
+            ORDER BY skips DESC
+            LIMIT ?
+            """,
+            (start, end, limit),
+        )
+
+    def track_history(self, track_id, start=0, end=None):
+        """
+        Every event for one track in [start, end), oldest first.
+        """
+        end = time.time() if end is None else end
+        return self._query(
+            "SELECT * FROM events WHERE track_id = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (track_id, start, end),
+        )
@@ -0,0 +1,69 @@
+# library.py
+
+import sys
+
+
+class Record:
+    """
+    Compact, slotted stand-in for a Subsonic JSON dict.
+
+    Only the fields the client reads are kept, repeated strings (artist,
+    album, genre, ...) are interned, and get()/[] keep dict-style call
+    sites working unchanged.
+    """
+    __slots__ = ()
+    INTERNED = ()
+
+    def __init__(self, data):
+        for field in self.__slots__:
+            value = data.get(field)
+            if field in self.INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def memory_cost(self):
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(v) for f in self.__slots__
+            if (v := getattr(self, f)) is not None and f not in self.INTERNED
+        )
+
+
+class Artist(Record):
+    __slots__ = ("id", "name", "albumCount", "coverArt")
+    INTERNED = ("name",)
+
+
+class Track(Record):
+    __slots__ = (
+        "id", "title", "artist", "album", "albumId", "genre", "year", "track", "duration",
+        "bitRate", "size", "suffix", "coverArt", "playCount", "userRating", "replayGain",
+    )
+    INTERNED = ("artist", "album", "albumId", "genre", "suffix", "coverArt")
+
+    def __init__(self, data):
+        super().__init__(data)
+        # Keep just the track gain, not the whole replayGain dict
+        gain = self.replayGain
+        if isinstance(gain, dict):
+            self.replayGain = gain.get("trackGain", gain.get("albumGain"))
+
+
+class Album(Record):
+    __slots__ = ("id", "name", "artist", "coverArt", "song")
+    INTERNED = ("name", "artist", "coverArt")
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.song = [Track(s) for s in (self.song or [])]
+
+    def memory_cost(self):
+        return super().memory_cost() + sum(t.memory_cost() for t in self.song)
@@ -0,0 +1,186 @@
+# memory.py
+
+import itertools
+import os
+import sys
+from collections import OrderedDict
+
+DEFAULT_BUDGET_MB = 64
+
+_missing = object()
+
+
+def pixmap_cost(pixmap):
+    """
+    Approximate decoded size of a QPixmap/QImage in bytes.
+    """
+    if pixmap is None or pixmap.isNull():
+        return 0
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+def object_cost(value):
+    """
+    Rough size of a record, list of records or small dict in bytes.
+    """
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(object_cost(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value.values())
+    if hasattr(value, "memory_cost"):
+        return value.memory_cost()
+    return sys.getsizeof(value)
+
+
+def process_rss():
+    """
+    Resident set size of this process in bytes, or None where it cannot be read.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class BoundedCache:
+    """
+    LRU mapping whose entries count against a shared MemoryBudget.
+    Supports the dict operations the rest of the client uses on caches.
+    """
+    def __init__(self, name, cost=object_cost, budget=None, max_entries=None):
+        self.name = name
+        self.cost = cost
+        self.max_entries = max_entries
+        self.budget = None
+        self._entries = OrderedDict()  # key -> (value, cost, tick)
+        self.bytes = 0
+        if budget is not None:
+            budget.register(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __getitem__(self, key):
+        value = self.get(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, cost, _ = entry
+        self._entries[key] = (value, cost, self._tick())
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if key in self._entries:
+            self.pop(key)
+        cost = self.cost(value)
+        self._entries[key] = (value, cost, self._tick())
+        self.bytes += cost
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self.evict_oldest()
+        if self.budget is not None:
+            self.budget.enforce(keep=self)
+
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.bytes -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def oldest_tick(self):
+        if not self._entries:
+            return None
+        return next(iter(self._entries.values()))[2]
+
+    def evict_oldest(self):
+        key = next(iter(self._entries))
+        self.pop(key)
+
+    def _tick(self):
+        return next(self.budget.ticks) if self.budget is not None else 0
+
+
+class MemoryBudget:
+    """
+    Shared byte budget over several BoundedCaches.
+
+    Gauges measure structures that cannot be evicted; they still count
+    toward the total, so the caches shrink to make room for them.
+
+    When the total goes over the limit, the least recently used entry
+    across all registered caches is evicted until it fits again. The entry
+    that was just inserted is never evicted, even if it alone is too big.
+    """
+    def __init__(self, limit_bytes):
+        self.limit_bytes = limit_bytes
+        self.caches = []
+        self.gauges = {}
+        self.ticks = itertools.count()
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(int(config.get("memory_budget_mb", DEFAULT_BUDGET_MB) * 1024 * 1024))
+
+    def register(self, cache):
+        cache.budget = self
+        self.caches.append(cache)
+        return cache
+
+    def add_gauge(self, name, measure):
+        """
+        Count a structure that cannot be evicted (measure() -> (items, bytes)).
+        measure() runs on every enforce and report, so it must be cheap.
+        """
+        self.gauges[name] = measure
+
+    def kept_bytes(self):
+        return sum(measure()[1] for measure in self.gauges.values())
+
+    def total_bytes(self):
+        return sum(cache.bytes for cache in self.caches) + self.kept_bytes()
+
+    def enforce(self, keep=None):
+        """
+        Evict until the budget fits. keep is a cache whose newest entry stays.
+        """
+        limit = self.limit_bytes - self.kept_bytes()
+        while sum(cache.bytes for cache in self.caches) > limit:
+            # The newest entry sits last, so it is only the oldest when alone
+            candidates = [c for c in self.caches if len(c) > (1 if c is keep else 0)]
+            if not candidates:
+                return
+            min(candidates, key=lambda c: c.oldest_tick()).evict_oldest()
+            self.evictions += 1
+
+    def report(self):
+        """
+        Human-readable summary of what each cache holds.
+        """
+        lines = [f"{c.name}: {len(c)} item(s), {c.bytes / 1e6:.1f} MB" for c in self.caches]
+        for name, measure in self.gauges.items():
+            items, size = measure()
+            lines.append(f"{name} (kept): {items} item(s), {size / 1e6:.1f} MB")
+        lines.append(f"Total: {self.total_bytes() / 1e6:.1f} of {self.limit_bytes / 1e6:.0f} MB budget, {self.evictions} eviction(s)")
+        rss = process_rss()
+        if rss is not None:
+            lines.append(f"Process RSS: {rss / 1e6:.0f} MB")
+        return "\n".join(lines)
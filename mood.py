@@ -0,0 +1,86 @@
+# mood.py
+
+import numpy as np
+
+from features import FEATURES
+
+# Each mood pulls normalized features toward a target with a weight, and
+# nudges genres whose name contains one of the keywords.
+MOODS = {
+    "Cozy": {
+        "targets": {"duration": (0.5, 1.0), "replayGain": (0.7, 1.0), "playCount": (0.8, 1.5), "userRating": (0.9, 1.5)},
+        "genres": {"acoustic": 1.0, "folk": 1.0, "jazz": 0.8, "soul": 0.8, "singer": 0.8, "indie": 0.5, "metal": -1.5, "hardcore": -1.5},
+        "temperature": 0.35,
+    },
+    "Focused": {
+        "targets": {"duration": (0.7, 1.0), "replayGain": (0.6, 0.5), "playCount": (0.4, 0.5), "bitRate": (0.8, 0.3)},
+        "genres": {"ambient": 1.0, "classical": 1.2, "instrumental": 1.2, "electronic": 0.6, "lo-fi": 1.0, "soundtrack": 1.0, "post-rock": 0.8, "hip-hop": -0.5, "pop": -0.5},
+        "temperature": 0.3,
+    },
+    "Ambient": {
+        "targets": {"duration": (0.8, 1.0), "replayGain": (0.9, 1.5)},
+        "genres": {"ambient": 1.5, "drone": 1.5, "new age": 1.2, "downtempo": 1.0, "chill": 1.0, "rock": -1.0, "metal": -2.0, "punk": -2.0},
+        "temperature": 0.4,
+    },
+}
+
+
+class MoodEngine:
+    """
+    Scores every track in a TrackFeatures store against a mood preset and
+    samples queues from the scores in a single vectorized pass.
+    """
+    def __init__(self, features, moods=MOODS, seed=None):
+        self.features = features
+        self.moods = moods
+        self.rng = np.random.default_rng(seed)
+        self._scores = {}
+
+    def _genre_bonus(self, keywords):
+        # Small loop over the genre vocabulary, not the tracks
+        bonus = np.zeros(len(self.features.genres), dtype=np.float32)
+        for i, genre in enumerate(self.features.genres):
+            for keyword, weight in keywords.items():
+                if keyword in genre:
+                    bonus[i] += weight
+        return bonus
+
+    def scores(self, mood):
+        """
+        Return (and cache) the score of every track for mood; higher fits better.
+        """
+        if mood not in self._scores:
+            preset = self.moods[mood]
+            targets = np.full(len(FEATURES), 0.5, dtype=np.float32)
+            weights = np.zeros(len(FEATURES), dtype=np.float32)
+            for name, (target, weight) in preset["targets"].items():
+                j = FEATURES.index(name)
+                targets[j] = target
+                weights[j] = weight
+            distance = ((self.features.matrix - targets) ** 2) @ weights
+            genre_bonus = self._genre_bonus(preset.get("genres", {}))[self.features.genre_codes]
+            self._scores[mood] = genre_bonus - distance
+        return self._scores[mood]
+
+    def sample(self, mood, size=200, exclude_ids=None):
+        """
+        Return indices of up to size tracks drawn without replacement,
+        favouring higher scores (Gumbel top-k sampling).
+        """
+        scores = self.scores(mood)
+        temperature = self.moods[mood].get("temperature", 0.3)
+        keys = scores / temperature + self.rng.gumbel(size=scores.shape).astype(np.float32)
+        if exclude_ids:
+            keys[self.features.indices_of(exclude_ids)] = -np.inf
+        available = int(np.isfinite(keys).sum())
+        size = min(size, available)
+        if size <= 0:
+            return np.empty(0, dtype=np.intp)
+        top = np.argpartition(-keys, size - 1)[:size]
+        return top[np.argsort(-keys[top])]
+
+    def queue(self, mood, size=200, exclude_ids=None):
+        """
+        Build a play queue (list of song dicts) for mood.
+        """
+        return self.features.tracks(self.sample(mood, size, exclude_ids))
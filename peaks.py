@@ -0,0 +1,89 @@
+# peaks.py
+#
+# Peak/RMS envelopes for the waveform seek bar. Kept free of Qt so it can
+# run in worker processes.
+
+import os
+import struct
+import subprocess
+
+import numpy as np
+import requests
+
+from cache import peak_path, write_atomic
+
+PEAK_MAGIC = b"NDPK"
+PEAK_VERSION = 1
+BUCKETS = 2048
+SAMPLE_RATE = 8000  # plenty for an envelope, and cheap to decode
+
+_HEADER = struct.Struct("<4sHI")  # magic, version, bucket count
+
+
+def decode_mono(audio_path, sample_rate=SAMPLE_RATE):
+    """
+    Decode an audio file to mono float32 samples in [-1, 1] using ffmpeg.
+    """
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-nostdin", "-i", audio_path,
+         "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+    )
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def envelope(samples, buckets=BUCKETS):
+    """
+    Return (peaks, rms) arrays of length buckets, both in [0, 1].
+    """
+    if not len(samples):
+        return np.zeros(buckets, dtype=np.float32), np.zeros(buckets, dtype=np.float32)
+    # Bucket edges spread the samples evenly, so no bucket is only padding
+    edges = np.arange(buckets, dtype=np.int64) * len(samples) // buckets
+    counts = np.diff(np.append(edges, len(samples))).clip(min=1)
+    peaks = np.maximum.reduceat(np.abs(samples), edges)
+    rms = np.sqrt(np.add.reduceat(np.square(samples), edges) / counts)
+    return peaks, rms
+
+
+def save_peaks(path, peaks, rms):
+    header = _HEADER.pack(PEAK_MAGIC, PEAK_VERSION, len(peaks))
+    quantize = lambda values: np.clip(np.round(values * 255), 0, 255).astype(np.uint8).tobytes()
+    write_atomic(path, [header, quantize(peaks), quantize(rms)])
+
+
+def load_peaks(path):
+    """
+    Return (peaks, rms) as float32 arrays in [0, 1], or None if path is missing or invalid.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, buckets = _HEADER.unpack_from(data)
+    if magic != PEAK_MAGIC or version != PEAK_VERSION or len(data) != _HEADER.size + 2 * buckets:
+        return None
+    values = np.frombuffer(data, dtype=np.uint8, offset=_HEADER.size).astype(np.float32) / 255.0
+    return values[:buckets], values[buckets:]
+
+
+def build_peak_file(audio_path, download_url=None):
+    """
+    Process-pool job: make sure a peak file exists for audio_path and return its path.
+    If the audio is not cached yet and download_url is given, it is downloaded first.
+    """
+    path = peak_path(audio_path)
+    if os.path.exists(path):
+        return path
+    if not os.path.exists(audio_path):
+        if not download_url:
+            raise FileNotFoundError(audio_path)
+        with requests.get(download_url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            write_atomic(audio_path, response.iter_content(chunk_size=256 * 1024))
+    peaks, rms = envelope(decode_mono(audio_path))
+    save_peaks(path, peaks, rms)
+    return path
@@ -0,0 +1,205 @@
+# playback.py
+
+import os
+import time
+
+import vlc
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from cache import audio_path
+
+# Tunables, overridable in config.json
+DEFAULTS = {
+    "network_caching_ms": 3000,   # how much audio libVLC buffers ahead from the network
+    "preroll_ms": 2000,           # replayed before the stall point when resuming
+    "stall_timeout_ms": 4000,     # no progress for this long while playing counts as a stall
+    "stream_max_retries": 5,      # reopen attempts per stall before giving up
+}
+
+# An Ended state this far before the known track length means the connection dropped
+EARLY_END_MARGIN_MS = 3000
+
+# Extra time on top of network_caching_ms a freshly opened stream gets to
+# start playing (server-side transcoding, TLS setup on mobile) before it
+# counts as stalled
+STARTUP_MARGIN_MS = 5000
+
+
+class PlaybackSupervisor(QObject):
+    """
+    Owns the VLC player for the current stream and keeps it alive.
+
+    Tracks already in the local audio cache are played from disk instead
+    of being streamed.
+
+    A poll timer watches the player state. Errors, premature end of stream,
+    and playback that stops advancing all count as a stall; a stream that
+    is still filling its buffer after opening gets a longer grace period. The supervisor
+    then reopens the stream at the last position minus a short pre-roll.
+    libVLC turns the start-time option into an HTTP Range request. From the
+    second attempt on, it first fails over to another server endpoint when
+    more than one is configured.
+    """
+    stalled = pyqtSignal(int)        # attempt number
+    recovered = pyqtSignal(int)      # stall duration in ms
+    gave_up = pyqtSignal()
+
+    def __init__(self, config, parent=None):
+        super().__init__(parent)
+        self.config = config
+        settings = {key: config.get(key, default) for key, default in DEFAULTS.items()}
+        self.network_caching_ms = settings["network_caching_ms"]
+        self.preroll_ms = settings["preroll_ms"]
+        self.stall_timeout_ms = settings["stall_timeout_ms"]
+        self.max_retries = settings["stream_max_retries"]
+        if self.stall_timeout_ms <= self.network_caching_ms:
+            # Otherwise an ordinary rebuffer looks like a stall
+            print(f"stall_timeout_ms ({self.stall_timeout_ms}) must exceed network_caching_ms "
+                  f"({self.network_caching_ms}); using {self.network_caching_ms + 1000}.")
+            self.stall_timeout_ms = self.network_caching_ms + 1000
+        self.startup_timeout_ms = max(self.stall_timeout_ms, self.network_caching_ms + STARTUP_MARGIN_MS)
+
+        self.instance = vlc.Instance(f"--network-caching={self.network_caching_ms}", "--http-reconnect")
+        self.player = None
+        self.api = None
+        self.song = None
+        self.local = False
+
+        self.stats = {"stalls": 0, "recoveries": 0, "failures": 0, "stall_ms_total": 0, "longest_stall_ms": 0}
+        self._reset_tracking(0)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._check)
+
+    def _reset_tracking(self, position_ms):
+        self._last_position = position_ms
+        self._last_progress = time.monotonic()
+        self._stall_started = None
+        self._attempts = 0
+
+    def play(self, api, song, start_ms=0):
+        """
+        Start streaming song from api and return the VLC media player.
+        """
+        self.api = api
+        self.song = song
+        self._reset_tracking(start_ms)
+        self._open(start_ms)
+        self._timer.start(500)
+        return self.player
+
+    def stop(self):
+        self._timer.stop()
+        if self.player:
+            try:
+                self.player.stop()
+                self.player.release()
+            except Exception:
+                pass
+            self.player = None
+
+    def _open(self, start_ms):
+        if self.player is None:
+            self.player = self.instance.media_player_new()
+        else:
+            self.player.stop()
+        path = audio_path(self.config, self.song)
+        self.local = os.path.exists(path)
+        if self.local:
+            media = self.instance.media_new_path(os.path.abspath(path))
+        else:
+            media = self.instance.media_new(self.api.build_url("stream.view", {"id": self.song["id"]}))
+        media.add_option(f":network-caching={self.network_caching_ms}")
+        if start_ms > 0:
+            media.add_option(f":start-time={start_ms / 1000:.3f}")
+        self.player.set_media(media)
+        media.release()
+        self.player.play()
+        self._last_progress = time.monotonic()
+        # Until the clock first moves, the stream is still filling its buffer
+        self._started = False
+
+    def _expected_length(self):
+        length = self.player.get_length()
+        if length <= 0:
+            length = int(self.song.get("duration") or 0) * 1000
+        return length
+
+    def _check(self):
+        if not self.player:
+            return
+        state = self.player.get_state()
+        now = time.monotonic()
+
+        if state == vlc.State.Ended:
+            length = self._expected_length()
+            if length and self._last_position < length - EARLY_END_MARGIN_MS:
+                self._handle_stall(now)
+            else:
+                self._timer.stop()
+            return
+        if state == vlc.State.Error:
+            self._handle_stall(now)
+            return
+        if state in (vlc.State.Paused, vlc.State.Stopped):
+            self._last_progress = now
+            return
+
+        position = self.player.get_time()
+        if state == vlc.State.Playing and position >= 0 and position != self._last_position:
+            self._last_position = position
+            self._last_progress = now
+            self._started = True
+            if self._stall_started is not None:
+                self._finish_stall(now)
+        else:
+            # Opening/Buffering, or Playing without the clock moving
+            timeout_ms = self.stall_timeout_ms if self._started else self.startup_timeout_ms
+            if (now - self._last_progress) * 1000 > timeout_ms:
+                self._handle_stall(now)
+
+    def _handle_stall(self, now):
+        if self._stall_started is None:
+            self._stall_started = now
+            self.stats["stalls"] += 1
+        self._attempts += 1
+        if self._attempts > self.max_retries:
+            print(f"Stream for {self.song.get('id')} could not be recovered.")
+            self.stats["failures"] += 1
+            self._record_stall_time(now)
+            self._timer.stop()
+            self.gave_up.emit()
+            return
+
+        self.stalled.emit(self._attempts)
+        # Reopening the same endpoint first covers brief Wi-Fi drops. Failing
+        # over only makes sense with somewhere else to go; if no endpoint
+        # answers, keep retrying the current one until the network is back.
+        endpoints = getattr(self.api, "endpoints", ())
+        if self._attempts > 1 and len(endpoints) > 1 and not self.local:
+            if not self.api.failover():
+                print("No other endpoint reachable, retrying the current one.")
+        resume_at = max(0, self._last_position - self.preroll_ms)
+        print(f"Stream stalled at {self._last_position} ms, reopening at {resume_at} ms (attempt {self._attempts})")
+        try:
+            self._open(resume_at)
+        except Exception as e:
+            print(f"Reopening stream failed: {e}")
+
+    def _finish_stall(self, now):
+        duration_ms = self._record_stall_time(now)
+        self.stats["recoveries"] += 1
+        self._stall_started = None
+        self._attempts = 0
+        self.recovered.emit(duration_ms)
+
+    def _record_stall_time(self, now):
+        duration_ms = int((now - self._stall_started) * 1000)
+        self.stats["stall_ms_total"] += duration_ms
+        self.stats["longest_stall_ms"] = max(self.stats["longest_stall_ms"], duration_ms)
+        return duration_ms
+
+    def summary(self):
+        s = self.stats
+        return (f"{s['stalls']} stall(s), {s['recoveries']} recovered, {s['failures']} lost; "
+                f"{s['stall_ms_total'] / 1000:.1f}s total, longest {s['longest_stall_ms'] / 1000:.1f}s")
@@ -0,0 +1,217 @@
+# theme.py
+
+import numpy as np
+from PyQt6.QtCore import (
+    QBuffer, QByteArray, QEasingCurve, QObject, QParallelAnimationGroup,
+    QPropertyAnimation, QRunnable, QSize, QThreadPool, pyqtProperty, pyqtSignal
+)
+from PyQt6.QtGui import QColor, QImage, QImageReader, QLinearGradient, QPainter
+from PyQt6.QtWidgets import QStyle, QStyleOption, QWidget
+
+SAMPLE_SIZE = 48
+DEFAULT_PALETTE = {"start": "#2e2e2e", "end": "#4b4b4b", "accent": "#66aaff", "text": "#ffffff"}
+
+
+def _hex(rgb):
+    r, g, b = (int(round(c)) for c in rgb)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def extract_palette(pixels):
+    """
+    Derive a gradient palette from an (N, 3) uint8 array of RGB pixels.
+
+    Pixels are quantized to 4 bits per channel and histogrammed with
+    bincount; bins are ranked by population, weighted toward saturated
+    colours so a grey border does not win over the artwork itself.
+    """
+    pixels = pixels.reshape(-1, 3)
+    if not len(pixels):
+        return dict(DEFAULT_PALETTE)
+    quantized = (pixels >> 4).astype(np.int32)
+    codes = (quantized[:, 0] << 8) | (quantized[:, 1] << 4) | quantized[:, 2]
+    counts = np.bincount(codes, minlength=4096)
+    used = np.nonzero(counts)[0]
+    means = np.stack(
+        [np.bincount(codes, weights=pixels[:, c], minlength=4096)[used] for c in range(3)], axis=1
+    ) / counts[used, None]
+
+    saturation = (means.max(axis=1) - means.min(axis=1)) / 255.0
+    order = np.argsort(-(counts[used] * (0.25 + saturation)))
+    ranked = means[order]
+
+    start = ranked[0]
+    # Second stop: the most prominent colour clearly distinct from the first
+    distance = np.linalg.norm(ranked - start, axis=1)
+    distinct = np.nonzero(distance > 60)[0]
+    end = ranked[distinct[0]] if len(distinct) else start * 0.6
+
+    top = order[:8]
+    accent = means[top[np.argmax(saturation[top])]]
+
+    luminance = np.dot((start + end) / 2, [0.299, 0.587, 0.114]) / 255.0
+    return {
+        "start": _hex(start),
+        "end": _hex(end),
+        "accent": _hex(accent),
+        "text": "#000000" if luminance > 0.55 else "#ffffff",
+    }
+
+
+def image_pixels(image):
+    """
+    Return the pixels of a QImage as an (N, 3) uint8 array.
+    """
+    image = image.convertToFormat(QImage.Format.Format_RGB888)
+    width, height, stride = image.width(), image.height(), image.bytesPerLine()
+    buffer = np.frombuffer(image.constBits().asstring(stride * height), dtype=np.uint8)
+    return buffer.reshape(height, stride)[:, :width * 3].reshape(-1, 3)
+
+
+class PaletteSignals(QObject):
+    ready = pyqtSignal(str, object)
+
+
+class PaletteWorker(QRunnable):
+    """
+    Decodes cover art at thumbnail size and extracts its palette off the GUI thread.
+    """
+    def __init__(self, cover_id, data, signals):
+        super().__init__()
+        self.cover_id = cover_id
+        self.data = data
+        self.signals = signals
+
+    def run(self):
+        buffer = QBuffer()
+        buffer.setData(QByteArray(self.data))
+        buffer.open(QBuffer.OpenModeFlag.ReadOnly)
+        reader = QImageReader(buffer)
+        # Lets the JPEG decoder scale while decoding instead of decoding full size
+        reader.setScaledSize(QSize(SAMPLE_SIZE, SAMPLE_SIZE))
+        image = reader.read()
+        palette = extract_palette(image_pixels(image)) if not image.isNull() else dict(DEFAULT_PALETTE)
+        self.signals.ready.emit(self.cover_id, palette)
+
+
+class GradientBackground(QWidget):
+    """
+    Central widget that paints an animatable two-stop gradient while the
+    Adaptive theme is active, and a normal styled background otherwise.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.adaptive = False
+        self._start_color = QColor(DEFAULT_PALETTE["start"])
+        self._end_color = QColor(DEFAULT_PALETTE["end"])
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if not self.adaptive:
+            option = QStyleOption()
+            option.initFrom(self)
+            self.style().drawPrimitive(QStyle.PrimitiveElement.PE_Widget, option, painter, self)
+            return
+        gradient = QLinearGradient(0, 0, self.width(), self.height())
+        gradient.setColorAt(0, self._start_color)
+        gradient.setColorAt(1, self._end_color)
+        painter.fillRect(self.rect(), gradient)
+
+    def getStartColor(self):
+        return self._start_color
+
+    def setStartColor(self, color):
+        self._start_color = color
+        self.update()
+
+    def getEndColor(self):
+        return self._end_color
+
+    def setEndColor(self, color):
+        self._end_color = color
+        self.update()
+
+    startColor = pyqtProperty(QColor, fget=getStartColor, fset=setStartColor)
+    endColor = pyqtProperty(QColor, fget=getEndColor, fset=setEndColor)
+
+
+class AdaptiveTheme(QObject):
+    """
+    Keeps the window palette in step with the current cover art.
+
+    Palettes are cached per coverArt id, so a repeated cover costs a dict
+    lookup. New palettes only animate the background's two colour
+    properties; the stylesheet is rebuilt only when the text colour flips.
+    """
+    def __init__(self, window, background, palettes=None):
+        super().__init__(window)
+        self.window = window
+        self.background = background
+        self.palettes = {} if palettes is None else palettes
+        self.current = dict(DEFAULT_PALETTE)
+        self.pending_cover_id = None
+        self.signals = PaletteSignals()
+        self.signals.ready.connect(self._on_palette_ready)
+
+        self._animation = QParallelAnimationGroup(self)
+        self._start_anim = QPropertyAnimation(background, b"startColor", self)
+        self._end_anim = QPropertyAnimation(background, b"endColor", self)
+        for anim in (self._start_anim, self._end_anim):
+            anim.setDuration(600)
+            anim.setEasingCurve(QEasingCurve.Type.InOutCubic)
+            self._animation.addAnimation(anim)
+
+    def set_enabled(self, enabled):
+        self.background.adaptive = enabled
+        self.background.update()
+
+    def stylesheet(self):
+        text = self.current["text"]
+        overlay = "255, 255, 255" if text == "#000000" else "0, 0, 0"
+        return f"""
+            QWidget {{
+                background: transparent;
+                color: {text};
+            }}
+            QPushButton {{
+                background-color: rgba({overlay}, 0.25);
+                color: {text};
+                border: 2px solid rgba({overlay}, 0.4);
+                padding: 6px;
+                border-radius: 8px;
+            }}
+            QPushButton:hover {{
+                background-color: rgba({overlay}, 0.45);
+            }}
+        """
+
+    def update_from_cover(self, cover_id, data):
+        """
+        Switch to the palette of cover_id, extracting it in the background if needed.
+        data may be None when the cover itself came from a cache.
+        """
+        self.pending_cover_id = cover_id
+        palette = self.palettes.get(cover_id)
+        if palette is not None:
+            self._apply(palette)
+            return
+        if not data:
+            return
+        QThreadPool.globalInstance().start(PaletteWorker(cover_id, bytes(data), self.signals))
+
+    def _on_palette_ready(self, cover_id, palette):
+        self.palettes[cover_id] = palette
+        if cover_id == self.pending_cover_id:
+            self._apply(palette)
+
+    def _apply(self, palette):
+        text_changed = palette["text"] != self.current["text"]
+        self.current = palette
+        self._animation.stop()
+        self._start_anim.setStartValue(self.background.startColor)
+        self._start_anim.setEndValue(QColor(palette["start"]))
+        self._end_anim.setStartValue(self.background.endColor)
+        self._end_anim.setEndValue(QColor(palette["end"]))
+        self._animation.start()
+        if text_changed and self.background.adaptive:
+            self.window.setStyleSheet(self.stylesheet())
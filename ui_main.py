@@ -1,14 +1,25 @@
+import os
+
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QLabel, QTabWidget, QHBoxLayout,
-    QPushButton, QLineEdit, QMessageBox, QListWidget, QListWidgetItem, QFrame, QSlider
+    QPushButton, QLineEdit, QMessageBox, QListWidget, QListWidgetItem, QFrame, QInputDialog
 )
-from PyQt6.QtGui import QFont, QPixmap, QIcon
+from PyQt6.QtGui import QFont, QPixmap
 from PyQt6.QtCore import Qt
-from api import NavidromeAPI
+from connection import ConnectionManager, servers_from_config
+from assets import assets
+from cache import cover_path
 from config import load_config, save_config
-import vlc
-import requests
+from features import TrackFeatures, iter_songs
+from journal import JOURNAL_PATH, Journal
+from library import Album, Artist, Track
+from memory import BoundedCache, MemoryBudget, pixmap_cost
+from mood import MOODS, MoodEngine
+from playback import PlaybackSupervisor
+from theme import AdaptiveTheme, GradientBackground
+from waveform import WaveformService, WaveformSlider
 from PyQt6.QtCore import pyqtProperty, QPropertyAnimation, QEasingCurve
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt6.QtGui import QColor, QPaintEvent, QPainter
 
 class AnimatedButton(QPushButton):
@@ -56,6 +67,28 @@ class AnimatedButton(QPushButton):
 
     bgColor = pyqtProperty(QColor, fget=getBgColor, fset=setBgColor)
 
+class LibrarySignals(QObject):
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class LibraryLoader(QRunnable):
+    """
+    Reads the whole library and builds the mood engine off the GUI thread.
+    """
+    def __init__(self, api, signals):
+        super().__init__()
+        self.api = api
+        self.signals = signals
+
+    def run(self):
+        try:
+            features = TrackFeatures(Track(song) for song in iter_songs(self.api))
+            self.signals.loaded.emit(MoodEngine(features))
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
 class MainWindow(QMainWindow):
     """
     Main application window for the Navidrome Comfort Client.
@@ -72,27 +105,55 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(600, 400)
 
         # Attempt auto-connect to Navidrome if credentials are saved
-        server = self.config.get("server")
+        servers = servers_from_config(self.config)
         username = self.config.get("username")
         password = self.config.get("password")
 
         self.api = None
-        if server and username and password:
+        if servers and username and password:
             try:
-                self.api = NavidromeAPI(server, username, password)
-                ping = self.api.ping()
-                if "subsonic-response" in ping:
+                self.api = ConnectionManager(servers, username, password)
+                if self.api.select():
                     print("Auto-connected to Navidrome.")
                 else:
                     print("Ping failed. Manual login may be required.")
             except Exception as e:
                 print(f"Auto-connect error: {e}")
 
+        # Memory budget shared by the album, cover and palette caches
+        self.memory = MemoryBudget.from_config(self.config)
+        self.album_cache = BoundedCache("Albums", budget=self.memory, max_entries=self.config.get("album_cache_entries", 50))
+        self.cover_cache = BoundedCache("Cover art", cost=pixmap_cost, budget=self.memory)
+        self.memory.register(assets().pixmaps)
+        self.memory.add_gauge("Mood library", self.mood_library_usage)
+
+        # Listening journal (written from a background thread)
+        self.journal = Journal(self.config.get("journal_path", JOURNAL_PATH))
+
+        # Playback supervisor keeps the stream alive across network hiccups
+        self.playback = PlaybackSupervisor(self.config, self)
+        self.playback.stalled.connect(self.on_stream_stalled)
+        self.playback.recovered.connect(self.on_stream_recovered)
+        self.playback.gave_up.connect(self.on_stream_lost)
+
+        # Waveform envelopes for the seek bar, computed in worker processes
+        self.waveforms = WaveformService(self.config, self)
+        self.waveforms.ready.connect(self.on_waveform_ready)
+
         self.offline_enabled = self.config.get("offline", False)
         self.affirmation_style = "Gentle"
 
         self.setup_ui()
 
+    def closeEvent(self, event):
+        """
+        Stop playback and make sure queued journal events reach disk before exiting.
+        """
+        self.playback.stop()
+        self.waveforms.shutdown()
+        self.journal.close()
+        super().closeEvent(event)
+
     def resizeEvent(self, event):
         """
         Ensure the background image always fills the window when resized.
@@ -115,13 +176,16 @@ class MainWindow(QMainWindow):
 
         # Background image using QLabel (resizes with window)
         self.bg_label = QLabel(self)
-        self.bg_pixmap = QPixmap("assets/background.jpg")
+        self.bg_pixmap = assets().pixmap("background.jpg")
         self.bg_label.setPixmap(self.bg_pixmap.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatioByExpanding))
         self.bg_label.setGeometry(0, 0, self.width(), self.height())
         self.bg_label.lower()
 
-        central_widget = QWidget()
+        central_widget = GradientBackground()
         self.setCentralWidget(central_widget)
+        self.adaptive_theme = AdaptiveTheme(
+            self, central_widget, palettes=BoundedCache("Cover palettes", budget=self.memory)
+        )
 
         layout = QVBoxLayout()
         central_widget.setLayout(layout)
@@ -172,7 +236,7 @@ class MainWindow(QMainWindow):
         library_layout.addWidget(frame)
 
         refresh_button = QPushButton("Refresh Library")
-        refresh_icon = QIcon("assets/icons/arrow-alt-circle-up.svg")
+        refresh_icon = assets().icon("arrow-alt-circle-up")
         refresh_button.setIcon(refresh_icon)
         refresh_button.setStyleSheet("padding: 8px; font-weight: bold;")
         refresh_button.clicked.connect(self.load_artists)
@@ -180,7 +244,7 @@ class MainWindow(QMainWindow):
 
     # Play button
         play_button = QPushButton("Play First Track")
-        play_icon = QIcon("assets/icons/circle-play.svg")
+        play_icon = assets().icon("circle-play")
         play_button.setIcon(play_icon)
         play_button.setStyleSheet("padding: 8px; font-weight: bold;")
         play_button.clicked.connect(self.play_first_track)
@@ -205,10 +269,11 @@ class MainWindow(QMainWindow):
         self.album_art_label.setStyleSheet("border-radius: 12px; background-color: rgba(0,0,0,0.3);")
         now_layout.addWidget(self.album_art_label)
 
-        # Seek bar
-        self.seek_slider = QSlider(Qt.Orientation.Horizontal)
-        self.seek_slider.setRange(0, 100)
+        # Seek bar (shows the track's waveform once it is available)
+        self.seek_slider = WaveformSlider(Qt.Orientation.Horizontal)
+        self.seek_slider.setRange(0, 1000)
         self.seek_slider.setValue(0)
+        self.seek_slider.setMinimumHeight(48)
         self.seek_slider.setStyleSheet("padding: 8px;")
         self.seek_slider.sliderMoved.connect(self.seek_position)
         now_layout.addWidget(self.seek_slider)
@@ -216,19 +281,19 @@ class MainWindow(QMainWindow):
         controls = QHBoxLayout()
 
         prev_button = QPushButton()
-        prev_icon = QIcon("assets/icons/circle-left.svg")
+        prev_icon = assets().icon("circle-left")
         prev_button.setIcon(prev_icon)
         prev_button.setToolTip("Previous track")
         prev_button.clicked.connect(self.play_previous_track)
 
         play_pause_button = QPushButton()
-        play_pause_icon = QIcon("assets/icons/circle-play.svg")
+        play_pause_icon = assets().icon("circle-play")
         play_pause_button.setIcon(play_pause_icon)
         play_pause_button.setToolTip("Play / Pause")
         play_pause_button.clicked.connect(self.toggle_play_pause)
 
         next_button = QPushButton()
-        next_icon = QIcon("assets/icons/circle-right.svg")
+        next_icon = assets().icon("circle-right")
         next_button.setIcon(next_icon)
         next_button.setToolTip("Next track")
         next_button.clicked.connect(self.play_next_track)
@@ -241,12 +306,28 @@ class MainWindow(QMainWindow):
         controls.addWidget(next_button)
         now_layout.addLayout(controls)
 
+        # Mood queue buttons
+        mood_buttons = QHBoxLayout()
+        for mood in MOODS:
+            btn = QPushButton(f"{mood} Queue")
+            btn.setToolTip(f"Build a queue of tracks that fit a {mood.lower()} mood")
+            btn.setStyleSheet("padding: 8px; font-weight: bold;")
+            btn.clicked.connect(lambda _, m=mood: self.play_mood_queue(m))
+            mood_buttons.addWidget(btn)
+        now_layout.addLayout(mood_buttons)
+
         # Affirmation Button
         affirmation_button = QPushButton("Get Affirmation")
         affirmation_button.setStyleSheet("padding: 8px; font-weight: bold; margin-top: 10px;")
         affirmation_button.clicked.connect(self.show_affirmation)
         now_layout.addWidget(affirmation_button)
 
+        # Journal note button
+        note_button = QPushButton("Write Journal Note")
+        note_button.setStyleSheet("padding: 8px; font-weight: bold;")
+        note_button.clicked.connect(self.write_journal_note)
+        now_layout.addWidget(note_button)
+
         tabs.addTab(now_tab, "Now Playing")
 
         # Settings Tab
@@ -259,7 +340,7 @@ class MainWindow(QMainWindow):
         settings_layout.addWidget(theme_label)
 
         theme_buttons = QHBoxLayout()
-        for mode in ["Cozy", "Focused", "Ambient"]:
+        for mode in ["Cozy", "Focused", "Ambient", "Adaptive"]:
             btn = QPushButton(mode)
             btn.clicked.connect(lambda _, m=mode: self.apply_theme(m))
             theme_buttons.addWidget(btn)
@@ -270,14 +351,14 @@ class MainWindow(QMainWindow):
         settings_layout.addWidget(login_label)
 
         self.server_input = QLineEdit()
-        self.server_input.setPlaceholderText("Server URL (e.g. http://localhost:4533)")
+        self.server_input.setPlaceholderText("Server URL(s), comma-separated (e.g. http://localhost:4533, https://music.example.com)")
         self.username_input = QLineEdit()
         self.username_input.setPlaceholderText("Username")
         self.password_input = QLineEdit()
         self.password_input.setPlaceholderText("Password")
         self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
 
-        self.server_input.setText(self.config.get("server", ""))
+        self.server_input.setText(", ".join(servers_from_config(self.config)))
         self.username_input.setText(self.config.get("username", ""))
         self.password_input.setText(self.config.get("password", ""))
 
@@ -314,10 +395,38 @@ class MainWindow(QMainWindow):
             affirm_buttons.addWidget(btn)
         settings_layout.addLayout(affirm_buttons)
 
+        memory_label = QLabel("Memory")
+        memory_label.setFont(QFont("Arial", 14))
+        settings_layout.addWidget(memory_label)
+
+        self.memory_readout = QLabel()
+        self.memory_readout.setStyleSheet("font-family: monospace;")
+        settings_layout.addWidget(self.memory_readout)
+
+        from PyQt6.QtCore import QTimer
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self.update_memory_readout)
+        self.memory_timer.start(2000)
+        self.update_memory_readout()
+
         tabs.addTab(settings_tab, "Settings")
+        tabs.currentChanged.connect(lambda _: self.update_memory_readout())
         # Auto refresh on start
         self.load_artists()
 
+    def update_memory_readout(self):
+        """
+        Refresh the live readout of what each cache holds, while it is on screen.
+        """
+        if self.memory_readout.isVisible():
+            self.memory_readout.setText(self.memory.report())
+
+    def mood_library_usage(self):
+        engine = getattr(self, "mood_engine", None)
+        if engine is None:
+            return 0, 0
+        return len(engine.features), engine.features.memory_cost()
+
     def get_affirmation(self):
         style = self.affirmation_style
         import random
@@ -358,6 +467,26 @@ class MainWindow(QMainWindow):
         affirmation = self.get_affirmation()
         QMessageBox.information(self, "Affirmation", affirmation)
 
+    def write_journal_note(self):
+        """
+        Ask for a short note (mood, intention, ...) and log it with the current track.
+        """
+        note, ok = QInputDialog.getText(self, "Journal", "How are you feeling? What is your intention?")
+        if ok and note.strip():
+            position = self.player.get_time() if getattr(self, "player", None) else None
+            self.journal.log("note", getattr(self, "current_song", None), note=note.strip(), position_ms=position)
+
+    def log_skip(self):
+        """
+        Record a skip if the current track is left before it has nearly finished.
+        """
+        if not getattr(self, "player", None) or not getattr(self, "current_song", None):
+            return
+        length = self.player.get_length()
+        position = self.player.get_time()
+        if length > 0 and 0 <= position < length * 0.9:
+            self.journal.log("skip", self.current_song, position_ms=position)
+
     # toggle offline mode
 
     def toggle_offline_mode(self):
@@ -370,24 +499,23 @@ class MainWindow(QMainWindow):
     # New method to connect to Navidrome
 
     def connect_to_navidrome(self):
-        server = self.server_input.text()
+        servers = [s.strip() for s in self.server_input.text().split(",") if s.strip()]
         username = self.username_input.text()
         password = self.password_input.text()
 
-        if not server.startswith("http://") and not server.startswith("https://"):
-            server = "http://" + server
+        servers = [s if s.startswith(("http://", "https://")) else "http://" + s for s in servers]
 
-        if not server or not username or not password:
+        if not servers or not username or not password:
             QMessageBox.warning(self, "Missing Info", "Please fill in all login fields.")
             return
 
         try:
-            self.api = NavidromeAPI(server, username, password)
-            ping = self.api.ping()
-            if "subsonic-response" in ping:
-                QMessageBox.information(self, "Connected", "🎉 Successfully connected to Navidrome!")
+            self.api = ConnectionManager(servers, username, password)
+            if self.api.select():
+                QMessageBox.information(self, "Connected", f"🎉 Successfully connected to Navidrome!\nUsing {self.api.base_url}")
                 self.config.update({
-                    "server": server,
+                    "server": servers[0],
+                    "servers": servers,
                     "username": username,
                     "password": password
                 })
@@ -415,7 +543,7 @@ class MainWindow(QMainWindow):
                     albums = artist.get("albumCount", 0)
                     display_text = f"{name}  •  {albums} album{'s' if albums != 1 else ''}"
                     item = QListWidgetItem(display_text)
-                    item.setData(Qt.ItemDataRole.UserRole, artist)
+                    item.setData(Qt.ItemDataRole.UserRole, Artist(artist))
                     self.artist_list.addItem(item)
 
             count = self.artist_list.count()
@@ -515,14 +643,29 @@ class MainWindow(QMainWindow):
                 border: 2px solid #66aaff;
             }
             """
+        elif mode == "Adaptive":
+            # Colours follow the cover art; see theme.AdaptiveTheme
+            widget_style = self.adaptive_theme.stylesheet()
+            button_style = ""
         else:
             widget_style = ""
             button_style = ""
 
         # Combine and apply both styles
+        self.adaptive_theme.set_enabled(mode == "Adaptive")
         self.setStyleSheet(widget_style + "\n" + button_style)
+        # Only a change from a theme already on screen is a mood; the startup theme is not
+        previous = getattr(self, "applied_theme", None)
+        if previous is not None and previous != mode:
+            self.journal.log("mood", getattr(self, "current_song", None), mood=mode)
+        self.applied_theme = mode
         self.config["theme"] = mode
         save_config(self.config)
+        # Pick up the palette of the cover already on screen instead of
+        # waiting for the next track; show_cover_art supplies the bytes if needed
+        cover_id = getattr(self, "current_cover_id", None)
+        if mode == "Adaptive" and cover_id:
+            self.show_cover_art(cover_id)
 
     def set_affirmation_style(self, style):
         """
@@ -543,45 +686,21 @@ class MainWindow(QMainWindow):
         
         # Fetch and display album art if cover_id is provided and valid
         if cover_id and isinstance(cover_id, str) and cover_id.strip():
-            cover_url = f"{self.api.base_url}/coverArt.view?id={cover_id}&u={self.api.username}&t={self.api.token}&s={self.api.salt}&v={self.api.api_version}&c=ComfortClient"
-            print(f"[DEBUG] Fetching album art from: {cover_url}")
-            try:
-                response = requests.get(cover_url)
-                if response.status_code == 200 and response.content:
-                    pixmap = QPixmap()
-                    success = pixmap.loadFromData(response.content)
-                    if success and not pixmap.isNull():
-                        self.album_art_label.setPixmap(
-                            pixmap.scaled(200, 200, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                        )
-                    else:
-                        print("Pixmap is null or failed to load.")
-                        self.album_art_label.setPixmap(QPixmap("assets/default_cover.png"))
-                else:
-                    print(f"Failed to fetch image. Status: {response.status_code}")
-                    self.album_art_label.setPixmap(QPixmap("assets/default_cover.png"))
-            except Exception as e:
-                print(f"Exception while fetching album art: {e}")
-                self.album_art_label.setPixmap(QPixmap("assets/default_cover.png"))
+            self.show_cover_art(cover_id)
         else:
             print(f"[DEBUG] Invalid cover_id: {cover_id}")
 
+        self.log_skip()
+
         # Stop previous player if exists
-        if hasattr(self, "player") and self.player:
-            try:
-                self.player.stop()
-                self.player.release()
-            except Exception:
-                pass
-        # If track_id is actually a dict (song object), extract info
-        if isinstance(track_id, dict):
+        self.playback.stop()
+        # If track_id is actually a song (dict or Track record), extract info
+        if isinstance(track_id, (dict, Track)):
             song = track_id
         else:
             # fallback for legacy calls
             song = {"id": track_id, "title": f"Track {track_id}"}
-        stream_url = f"{self.api.base_url}/stream.view?id={song['id']}&u={self.api.username}&t={self.api.token}&s={self.api.salt}&v={self.api.api_version}&c=ComfortClient"
-        self.player = vlc.MediaPlayer(stream_url)
-        self.player.play()
+        self.player = self.playback.play(self.api, song)
         song_title = song.get('title', f"Track {song['id']}")
         artist_name = song.get('artist', None)
         if not artist_name:
@@ -597,6 +716,8 @@ class MainWindow(QMainWindow):
             self.now_label.setText(f"▶ Now Playing: {song_title}")
 
         # Store current track/album info for navigation
+        self.current_song = song
+        self.journal.log("play", song)
         self.current_track_id = song['id']
         self.current_cover_id = cover_id
         # If available, store album tracks for navigation
@@ -605,8 +726,51 @@ class MainWindow(QMainWindow):
                 if t["id"] == song['id']:
                     self.current_track_index = idx
                     break
+        # Load (or start computing) the waveform for the seek bar
+        self.seek_slider.clear_envelope()
+        self.waveforms.request(self.api, song)
         # Start timer to update seek bar
         self.start_seek_timer()
+    def show_cover_art(self, cover_id):
+        """
+        Show the cover for cover_id, from the decoded cover cache when possible,
+        then from the on-disk cache filled by `cli.py cache --covers`.
+        """
+        adaptive = self.config.get("theme") == "Adaptive"
+        cached = self.cover_cache.get(cover_id)
+        if cached is not None and (not adaptive or cover_id in self.adaptive_theme.palettes):
+            self.album_art_label.setPixmap(cached)
+            if adaptive:
+                self.adaptive_theme.update_from_cover(cover_id, None)
+            return
+
+        try:
+            path = cover_path(self.config, cover_id)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    content = f.read()
+            else:
+                print(f"[DEBUG] Fetching album art for: {cover_id}")
+                content = self.api.get_cover_art(cover_id)
+            if content:
+                pixmap = QPixmap()
+                success = pixmap.loadFromData(content)
+                if success and not pixmap.isNull():
+                    scaled = pixmap.scaled(200, 200, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+                    self.cover_cache[cover_id] = scaled
+                    self.album_art_label.setPixmap(scaled)
+                    if adaptive:
+                        self.adaptive_theme.update_from_cover(cover_id, content)
+                else:
+                    print("Pixmap is null or failed to load.")
+                    self.album_art_label.setPixmap(assets().pixmap("default_cover.png"))
+            else:
+                print("Failed to fetch image: empty response.")
+                self.album_art_label.setPixmap(assets().pixmap("default_cover.png"))
+        except Exception as e:
+            print(f"Exception while fetching album art: {e}")
+            self.album_art_label.setPixmap(assets().pixmap("default_cover.png"))
+
     def start_seek_timer(self):
         """
         Start a QTimer to update the seek bar every 500ms.
@@ -628,11 +792,35 @@ class MainWindow(QMainWindow):
                 length = self.player.get_length()  # ms
                 pos = self.player.get_time()  # ms
                 if length > 0:
-                    percent = int((pos / length) * 100)
-                    self.seek_slider.setValue(percent)
+                    permille = int((pos / length) * 1000)
+                    self.seek_slider.setValue(permille)
             except Exception:
                 pass
 
+    def on_waveform_ready(self, song_id, peaks, rms):
+        """
+        Show the waveform if it belongs to the track that is still playing.
+        """
+        if song_id == getattr(self, "current_track_id", None):
+            self.seek_slider.set_envelope(peaks, rms)
+
+    def on_stream_stalled(self, attempt):
+        """
+        Show that the stream is being reopened; the queue and position are kept.
+        """
+        if attempt == 1:
+            self.now_playing_text = self.now_label.text()
+        self.now_label.setText(f"⏳ Reconnecting… (attempt {attempt})")
+
+    def on_stream_recovered(self, duration_ms):
+        self.now_label.setText(getattr(self, "now_playing_text", self.now_label.text()))
+        print(f"Stream recovered after {duration_ms} ms. {self.playback.summary()}")
+
+    def on_stream_lost(self):
+        self.seek_timer.stop()
+        self.now_label.setText("Connection lost: no reachable Navidrome server.")
+        print(self.playback.summary())
+
     def seek_position(self, value):
         """
         Seek to a position in the current track based on slider value.
@@ -640,7 +828,7 @@ class MainWindow(QMainWindow):
         if hasattr(self, "player") and self.player:
             length = self.player.get_length()
             if length > 0:
-                seek_ms = int((value / 100) * length)
+                seek_ms = int((value / 1000) * length)
                 self.player.set_time(seek_ms)
 
     # Get all artists
@@ -668,15 +856,22 @@ class MainWindow(QMainWindow):
         
     def get_album(self, album_id):
         """
-        Return album dict for a given album_id from the API.
+        Return the Album record for a given album_id, from the album cache or the API.
         """
         if not self.api:
             QMessageBox.warning(self, "Not Connected", "Please connect to Navidrome first.")
             return None
 
+        album = self.album_cache.get(album_id)
+        if album is not None:
+            return album
         try:
             data = self.api.get_album(album_id)
             album = data.get("subsonic-response", {}).get("album", None)
+            if album is None:
+                return None
+            album = Album(album)
+            self.album_cache[album_id] = album
             return album
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load album:\n{str(e)}")
@@ -706,8 +901,9 @@ class MainWindow(QMainWindow):
 
             # Get first album and its tracks
             first_album_id = albums[0]["id"]
-            album_data = self.api.get_album(first_album_id)
-            album_info = album_data.get("subsonic-response", {}).get("album", {})
+            album_info = self.get_album(first_album_id)
+            if album_info is None:
+                return
             tracks = album_info.get("song", [])
             cover_id = album_info.get("coverArt")  # ✅ Defined here
 
@@ -726,6 +922,56 @@ class MainWindow(QMainWindow):
 
 
 
+    def play_mood_queue(self, mood):
+        """
+        Build a queue for mood from the whole library and start playing it.
+        The library feature matrix is built on first use and reused afterwards.
+        """
+        if not self.api:
+            QMessageBox.warning(self, "Not Connected", "Please connect to Navidrome first.")
+            return
+
+        if getattr(self, "mood_engine", None) is None:
+            # The first queue waits for the library to load; the latest mood asked for wins
+            already_loading = getattr(self, "pending_mood", None) is not None
+            self.pending_mood = mood
+            if not already_loading:
+                self.now_playing_text = self.now_label.text()
+                self.now_label.setText("Reading your library…")
+                self.library_signals = LibrarySignals()
+                self.library_signals.loaded.connect(self.on_library_loaded)
+                self.library_signals.failed.connect(self.on_library_failed)
+                QThreadPool.globalInstance().start(LibraryLoader(self.api, self.library_signals))
+            return
+
+        try:
+            queue = self.mood_engine.queue(mood, size=self.config.get("mood_queue_size", 200))
+        except Exception as e:
+            QMessageBox.critical(self, "Mood Queue Error", f"Could not build a {mood} queue:\n{str(e)}")
+            return
+
+        if not queue:
+            QMessageBox.information(self, "Empty Library", "No tracks to build a queue from.")
+            return
+
+        self.journal.log("mood", getattr(self, "current_song", None), mood=mood)
+        self.current_album_tracks = queue
+        self.current_track_index = 0
+        self.play_stream(queue[0], queue[0].get("coverArt"))
+
+    def on_library_loaded(self, engine):
+        self.mood_engine = engine
+        # The feature store counts toward the budget; make room for it
+        self.memory.enforce()
+        mood, self.pending_mood = self.pending_mood, None
+        self.play_mood_queue(mood)
+
+    def on_library_failed(self, message):
+        mood, self.pending_mood = self.pending_mood, None
+        if self.now_label.text() == "Reading your library…":
+            self.now_label.setText(getattr(self, "now_playing_text", "Now Playing: nothing."))
+        QMessageBox.critical(self, "Mood Queue Error", f"Could not build a {mood} queue:\n{message}")
+
     def toggle_play_pause(self):
         """
         Toggle play/pause for the current track.
@@ -746,7 +992,7 @@ class MainWindow(QMainWindow):
             if idx < len(self.current_album_tracks) - 1:
                 next_track = self.current_album_tracks[idx + 1]
                 self.current_track_index = idx + 1
-                self.play_stream(next_track, self.current_cover_id)
+                self.play_stream(next_track, next_track.get("coverArt", self.current_cover_id))
             else:
                 QMessageBox.information(self, "End of Album", "No more tracks in this album.")
         else:
@@ -762,7 +1008,7 @@ class MainWindow(QMainWindow):
             if idx > 0:
                 prev_track = self.current_album_tracks[idx - 1]
                 self.current_track_index = idx - 1
-                self.play_stream(prev_track, self.current_cover_id)
+                self.play_stream(prev_track, prev_track.get("coverArt", self.current_cover_id))
             else:
                 QMessageBox.information(self, "Start of Album", "Already at the first track.")
         else:
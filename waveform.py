@@ -0,0 +1,171 @@
+# waveform.py
+
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PyQt6.QtCore import QObject, QPointF, QRectF, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPainterPath
+from PyQt6.QtWidgets import QSlider
+
+from cache import audio_path
+from peaks import build_peak_file, load_peaks, peak_path
+
+
+class WaveformService(QObject):
+    """
+    Computes peak files in a process pool and hands finished envelopes to the UI.
+
+    A track is decoded at most once: afterwards its .peaks file next to the
+    audio cache is loaded directly, including after a restart.
+    """
+    ready = pyqtSignal(str, object, object)  # song id, peaks, rms
+
+    def __init__(self, config, parent=None):
+        super().__init__(parent)
+        self.config = config
+        # Off by default: downloading the original doubles bandwidth on top of the stream
+        self.download = config.get("waveform_download", False)
+        self.enabled = shutil.which("ffmpeg") is not None
+        if not self.enabled:
+            print("ffmpeg not found on PATH; the seek bar will not show waveforms.")
+        # spawn keeps Qt state out of the workers
+        self.pool = ProcessPoolExecutor(
+            max_workers=config.get("waveform_workers", 2),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self.pending = set()
+
+    def request(self, api, song):
+        """
+        Emit ready for song as soon as its envelope is available.
+        """
+        song_id = song["id"]
+        path = audio_path(self.config, song)
+        envelope = load_peaks(peak_path(path))
+        if envelope is not None:
+            self.ready.emit(song_id, *envelope)
+            return
+        if not self.enabled or song_id in self.pending:
+            return
+        download_url = None
+        if not os.path.exists(path):
+            if not self.download:
+                return
+            download_url = api.build_url("download.view", {"id": song_id})
+        self.pending.add(song_id)
+        future = self.pool.submit(build_peak_file, path, download_url)
+        # Runs on a pool thread; the signal is queued to the GUI thread
+        future.add_done_callback(lambda f, song_id=song_id: self._on_done(song_id, f))
+
+    def _on_done(self, song_id, future):
+        self.pending.discard(song_id)
+        try:
+            envelope = load_peaks(future.result())
+        except Exception as e:
+            print(f"Waveform for {song_id} unavailable: {e}")
+            return
+        if envelope is not None:
+            self.ready.emit(song_id, *envelope)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class WaveformSlider(QSlider):
+    """
+    Seek slider that draws the track's waveform instead of a plain groove.
+
+    The envelope is reduced to one column per pixel and turned into a
+    QPainterPath once per size; repaints just fill the cached paths.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.peaks = None
+        self.rms = None
+        self._paths = None
+        self._path_size = None
+        self.played_color = QColor("#66aaff")
+        self.unplayed_color = QColor(255, 255, 255, 110)
+
+    def set_envelope(self, peaks, rms):
+        self.peaks = peaks
+        self.rms = rms
+        self._paths = None
+        self.update()
+
+    def clear_envelope(self):
+        self.set_envelope(None, None)
+
+    def _columns(self, values, width):
+        edges = np.linspace(0, len(values), width, endpoint=False).astype(np.intp)
+        return np.maximum.reduceat(values, edges)
+
+    def _mirrored_path(self, values, width, height):
+        middle = height / 2
+        xs = np.arange(len(values), dtype=np.float64) + 0.5
+        path = QPainterPath()
+        path.moveTo(QPointF(0, middle))
+        for x, v in zip(xs, values):
+            path.lineTo(QPointF(x, middle - v * middle))
+        for x, v in zip(xs[::-1], values[::-1]):
+            path.lineTo(QPointF(x, middle + v * middle))
+        path.closeSubpath()
+        return path
+
+    def _build_paths(self):
+        size = (self.width(), self.height())
+        if self._paths is not None and self._path_size == size:
+            return self._paths
+        width, height = max(1, size[0]), max(1, size[1])
+        peaks = self._columns(self.peaks, width)
+        rms = self._columns(self.rms, width)
+        self._paths = (self._mirrored_path(peaks, width, height), self._mirrored_path(rms, width, height))
+        self._path_size = size
+        return self._paths
+
+    def paintEvent(self, event):
+        if self.peaks is None:
+            super().paintEvent(event)
+            return
+        peak_path, rms_path = self._build_paths()
+        span = self.maximum() - self.minimum()
+        fraction = (self.value() - self.minimum()) / span if span else 0
+        played_width = self.width() * fraction
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        for clip, color in ((QRectF(0, 0, played_width, self.height()), self.played_color),
+                            (QRectF(played_width, 0, self.width() - played_width, self.height()), self.unplayed_color)):
+            painter.save()
+            painter.setClipRect(clip)
+            faded = QColor(color)
+            faded.setAlpha(color.alpha() // 2)
+            painter.fillPath(peak_path, faded)
+            painter.fillPath(rms_path, color)
+            painter.restore()
+        painter.fillRect(QRectF(played_width - 1, 0, 2, self.height()), Qt.GlobalColor.white)
+
+    def _seek_to(self, x):
+        if self.width() <= 0:
+            return
+        fraction = min(max(x / self.width(), 0.0), 1.0)
+        value = self.minimum() + round(fraction * (self.maximum() - self.minimum()))
+        self.setValue(value)
+        self.sliderMoved.emit(value)
+
+    def mousePressEvent(self, event):
+        if self.peaks is None:
+            super().mousePressEvent(event)
+            return
+        self._seek_to(event.position().x())
+
+    def mouseMoveEvent(self, event):
+        if self.peaks is None:
+            super().mouseMoveEvent(event)
+            return
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self._seek_to(event.position().x())